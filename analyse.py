@@ -2,11 +2,14 @@ import os
 import re
 import sys
 import json
-import argparse
-import subprocess
-import shutil
+import heapq
+import signal
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
+
+# Módulos usados só por relatórios, shards e cache (gzip, zlib, hashlib, datetime,
+# threading, argparse, xml) são importados dentro das funções que os usam, para
+# manter curta a inicialização de `dart-analyse check` em hooks de editor/pre-commit
 
 # --- CONFIGURAÇÃO ---
 DEFAULT_IGNORED_SUFFIXES = (
@@ -17,6 +20,40 @@ DEFAULT_IGNORED_SUFFIXES = (
     '_web.dart'
 )
 DEFAULT_OUTPUT_NAME = "RELATORIO_ARQUITETURA"
+SHARD_FORMAT = "dart-analyse-shard"
+SHARD_VERSION = 3
+OUTPUT_CHUNK_SIZE = 64 * 1024  # Tamanho do bloco escrito de cada vez no stream
+
+# Proteções do parser contra arquivos gerados/minificados ou patológicos
+PARSE_TIMEOUT_SECONDS = 5.0       # Tempo máximo de análise de complexidade por arquivo
+MAX_FILE_BYTES = 2 * 1024 * 1024  # Acima disso, o arquivo é tratado como gerado
+MAX_LINE_LENGTH = 5000            # Linhas maiores indicam código minificado/gerado
+MAX_PARAMS_LENGTH = 2000          # Limite da lista de parâmetros no regex de funções
+
+# Métricas por função (cache por hash do conteúdo do arquivo)
+FUNCTION_CACHE_FILE = Path('.analyse_cache') / 'functions.json.gz'
+FUNCTION_CACHE_VERSION = 3  # Incrementar ao mudar scan_function_metrics
+TOP_FUNCTIONS_COUNT = 20
+
+# Índice resumido lido por `dart-analyse check` (sem reanalisar o projeto)
+CHECK_INDEX_FILE = Path('.analyse_cache') / 'index.json'
+CHECK_BASELINE_FILE = Path('.analyse_cache') / 'baseline.json'
+CHECK_INDEX_VERSION = 1
+CHECK_MAX_FUNCTION_COMPLEXITY = 20
+MARKDOWN_PAGES_MANIFEST = '.dart-analyse-pages.json'  # Páginas geradas pelo --split
+DEFAULT_MODULE_DEPTH = 3  # Módulo = lib/<pasta>/<subpasta>, ex: lib/features/auth
+
+# Cores ANSI no mesmo esquema padrão do jq
+JSON_COLORS = {
+    "null": "1;30",
+    "false": "0;39",
+    "true": "0;39",
+    "number": "0;39",
+    "string": "0;32",
+    "array": "1;39",
+    "object": "1;39",
+    "key": "34;1",
+}
 # --------------------
 
 def load_ignore_patterns(root_path):
@@ -48,6 +85,264 @@ def should_ignore_file(filename, ignore_patterns):
             return True
     return False
 
+class ParseTimeout(Exception):
+    """Análise de um arquivo excedeu PARSE_TIMEOUT_SECONDS"""
+
+@contextmanager
+def parse_time_guard(seconds):
+    """Interrompe o bloco com ParseTimeout após `seconds` segundos
+
+    Usa SIGALRM, que também interrompe regex em execução. Em plataformas sem
+    SIGALRM (Windows) ou fora da thread principal, o bloco roda sem limite.
+    """
+    import threading
+
+    if not seconds or not hasattr(signal, 'SIGALRM') or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def on_timeout(signum, frame):
+        raise ParseTimeout()
+
+    previous = signal.signal(signal.SIGALRM, on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+# Regex do parser, compilados uma única vez no carregamento do módulo
+IMPORT_RE = re.compile(r"^\s*import\s+['\"](.+?)['\"]", re.MULTILINE)
+EXPORT_RE = re.compile(r"^\s*export\s+['\"](.+?)['\"]", re.MULTILINE)
+CLASS_NAME_RE = re.compile(r'\bclass\s+(\w+)')
+WIDGET_CLASS_RE = re.compile(r'\bclass\s+\w+\s+extends\s+(StatelessWidget|StatefulWidget|ConsumerWidget|HookWidget|ConsumerStatefulWidget)')
+FUNCTION_DECLARATION_RE = re.compile(r'\b(void|Future|String|int|bool|double|Widget|List|Map|Set)\s+\w+\s*\([^)]{0,%d}\)\s*(async\s*)?\{' % MAX_PARAMS_LENGTH)
+PRIVATE_MEMBER_RE = re.compile(r'\b(_\w+)')
+DECISION_KEYWORD_RE = re.compile(r'\b(?:if|else|for|while|case|catch)\b')  # Uma passada para todas as palavras-chave
+LOGICAL_OPERATOR_RE = re.compile(r'\?\?|&&|\|\|')
+
+# Tokens relevantes para a varredura de funções: comentários e strings são
+# consumidos inteiros para que chaves e palavras-chave dentro deles sejam ignoradas.
+# `?` colado a um tipo (`String? a`, `int?>`, `Foo?;`) é tipo anulável, não ternário
+FUNCTION_TOKEN_RE = re.compile(r"""
+    (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>r?'''.*?(?:'''|\Z)|r?\"\"\".*?(?:\"\"\"|\Z)|r?'(?:\\.|[^'\\\n])*'?|r?"(?:\\.|[^"\\\n])*"?)
+  | (?P<open>\{)
+  | (?P<close>\})
+  | (?P<semi>;)
+  | (?P<paren>[()])
+  | (?P<nullable>(?<=[\w$>)\]])\?(?=\s+[A-Za-z_$]|[;,)>}\]]))
+  | (?P<decision>\b(?:if|else|for|while|case|catch)\b|&&|\|\||\?\?|\?(?![.\[]))
+""", re.DOTALL | re.VERBOSE)
+CLASS_HEADER_RE = re.compile(r'\b(?:class|mixin|extension|enum)\s+(\w+)')
+CONTROL_HEADER_RE = re.compile(r'^(?:await\s+)?(if|else|for|while|switch|do|try|catch|finally|on)\b')
+FUNCTION_NAME_RE = re.compile(r'([A-Za-z_$][\w$]*)$')
+GETTER_HEADER_RE = re.compile(r'\bget\s+([A-Za-z_$][\w$]*)\s*$')
+FUNCTION_TAIL_RE = re.compile(r'\s*(?:(?:async\*?|sync\*)?\s*$|:)')
+ANNOTATION_RE = re.compile(r'@[\w.]+(?:\([^()]*\))?')
+CONTROL_KEYWORDS = {'if', 'for', 'while', 'switch', 'catch', 'return', 'await', 'assert'}
+
+def _strip_type_arguments(text):
+    """Remove espaços e os parâmetros de tipo finais (`nome<T, U>` -> `nome`)"""
+    text = text.rstrip()
+    if not text.endswith('>'):
+        return text
+    depth = 0
+    for i in range(len(text) - 1, -1, -1):
+        if text[i] == '>':
+            depth += 1
+        elif text[i] == '<':
+            depth -= 1
+            if depth == 0:
+                return text[:i].rstrip()
+    return text
+
+def _function_name_from_header(header):
+    """Nome da função/método declarado em `header` (texto antes de `{`), ou None"""
+    getter = GETTER_HEADER_RE.search(header)
+    if getter:
+        return getter.group(1)
+
+    header = ANNOTATION_RE.sub(' ', header)
+
+    # Procura o primeiro grupo de parâmetros de nível superior: o nome vem antes
+    # dele e depois só pode haver modificadores ou uma lista de inicialização
+    depth = 0
+    group_start = None
+    for i, char in enumerate(header):
+        if char == '(':
+            if depth == 0:
+                group_start = i
+            depth += 1
+        elif char == ')' and depth > 0:
+            depth -= 1
+            if depth == 0:
+                match = FUNCTION_NAME_RE.search(_strip_type_arguments(header[:group_start]))
+                if match and match.group(1) == 'Function':
+                    continue  # Tipo de função (ex: `void Function(int) nome(...)`)
+                if not match or match.group(1) in CONTROL_KEYWORDS:
+                    return None
+                if FUNCTION_TAIL_RE.match(header, i + 1):
+                    return match.group(1)
+                return None
+    return None
+
+def scan_function_metrics(content):
+    """Métricas por função/método em uma única varredura linear de chaves
+
+    Mantém uma pilha de blocos abertos ({) classificados como classe, função,
+    estrutura de controle ou bloco comum. Pontos de decisão e aninhamento são
+    atribuídos à função nomeada mais interna (closures contam para a função
+    que as contém).
+
+    Returns:
+        Lista de dicts com name, class, line, loc, complexity,
+        cognitive_complexity e max_nesting, na ordem em que aparecem
+    """
+    functions = []
+    stack = []  # (tipo, valor, profundidade de parênteses ao abrir)
+    current = None  # Registro da função nomeada mais interna
+    nesting = 0  # Blocos de controle abertos dentro de `current`
+    parens = 0  # Parênteses abertos desde o último `{`
+    header_start = 0
+    line = 1
+    line_pos = 0
+
+    for token in FUNCTION_TOKEN_RE.finditer(content):
+        kind = token.lastgroup
+        pos = token.start()
+
+        if kind == 'decision':
+            if current is not None:
+                current["complexity"] += 1
+            continue
+        if kind in ('comment', 'string', 'nullable'):
+            continue
+        if kind == 'paren':
+            parens = parens + 1 if token.group() == '(' else max(0, parens - 1)
+            continue
+        if kind == 'semi' and parens:
+            continue  # `;` dentro de parênteses, ex: `for (var i = 0; i < n; i++)`
+
+        if kind == 'open':
+            if parens:
+                # Parâmetros nomeados ou closure passada como argumento: o
+                # cabeçalho externo continua aberto e é restaurado no `}`
+                stack.append(('argument', header_start, parens))
+                parens = 0
+                header_start = token.end()
+                continue
+
+            header = content[header_start:pos]
+            # Remove comentários/strings do cabeçalho antes de classificá-lo
+            header = FUNCTION_TOKEN_RE.sub(
+                lambda m: '' if m.lastgroup in ('comment', 'string') else m.group(0), header
+            ).strip()
+            line += content.count('\n', line_pos, pos)
+            line_pos = pos
+
+            class_match = CLASS_HEADER_RE.search(header)
+            control_match = CONTROL_HEADER_RE.match(header)
+            name = None if class_match or control_match else _function_name_from_header(header)
+
+            if class_match:
+                stack.append(('class', class_match.group(1), 0))
+            elif control_match:
+                if current is not None and control_match.group(1) not in ('try', 'finally'):
+                    increment = 1 if control_match.group(1) == 'else' else 1 + nesting
+                    current["cognitive_complexity"] += increment
+                nesting += 1
+                if current is not None:
+                    current["max_nesting"] = max(current["max_nesting"], nesting)
+                stack.append(('control', None, 0))
+            elif name:
+                owner = next((value for block, value, _ in reversed(stack) if block == 'class'), None)
+                record = {
+                    "name": name,
+                    "class": owner,
+                    "line": line,
+                    "loc": 0,
+                    "complexity": 1,
+                    "cognitive_complexity": 0,
+                    "max_nesting": 0,
+                }
+                functions.append(record)
+                stack.append(('function', (current, nesting), 0))
+                current = record
+                nesting = 0
+            else:
+                stack.append(('block', None, 0))
+
+        elif kind == 'close' and stack:
+            block, value, parens = stack.pop()
+            if block == 'argument':
+                header_start = value
+                continue
+            if block == 'control':
+                nesting = max(0, nesting - 1)
+            elif block == 'function':
+                line += content.count('\n', line_pos, pos)
+                line_pos = pos
+                current["loc"] = line - current["line"] + 1
+                current, nesting = value
+
+        header_start = token.end()
+
+    return functions
+
+def load_function_cache(root_path):
+    """Carrega o cache {hash do conteúdo: métricas por função}; vazio se ausente/inválido"""
+    import gzip
+
+    cache_path = root_path / FUNCTION_CACHE_FILE
+    if not cache_path.exists():
+        return {}
+    try:
+        with gzip.open(cache_path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Aviso: Cache de funções ignorado ({e})", file=sys.stderr)
+        return {}
+    if data.get("version") != FUNCTION_CACHE_VERSION:
+        return {}
+    return data.get("entries", {})
+
+def save_function_cache(root_path, all_files, previous_cache):
+    """Grava o cache apenas com os arquivos atuais, se algo mudou desde a carga"""
+    import gzip
+
+    entries = {f.content_hash: f.functions for f in all_files.values() if f.content_hash}
+    if entries.keys() == previous_cache.keys():
+        return
+    cache_path = root_path / FUNCTION_CACHE_FILE
+    try:
+        cache_path.parent.mkdir(exist_ok=True)
+        with gzip.open(cache_path, 'wt', encoding='utf-8') as f:
+            write_json_stream({"version": FUNCTION_CACHE_VERSION, "entries": entries}, f, compact=True)
+    except OSError as e:
+        print(f"Aviso: Não foi possível gravar o cache de funções: {e}", file=sys.stderr)
+
+def top_complex_functions(files, count=TOP_FUNCTIONS_COUNT):
+    """As `count` funções mais complexas do projeto, via heap (sem ordenar tudo)"""
+    candidates = (
+        (f, function) for f in files for function in f.functions
+    )
+    top = heapq.nlargest(
+        count, candidates,
+        key=lambda item: (item[1]["complexity"], item[1]["cognitive_complexity"])
+    )
+    return [{
+        "path": str(f.rel_path).replace('\\', '/'),
+        "function": function["name"],
+        "class": function["class"],
+        "line": function["line"],
+        "loc": function["loc"],
+        "complexity": function["complexity"],
+        "cognitive_complexity": function["cognitive_complexity"],
+        "max_nesting": function["max_nesting"]
+    } for f, function in top]
+
 class DartFile:
     def __init__(self, path, package_name, root_path):
         self.path = Path(path).resolve()
@@ -78,46 +373,94 @@ class DartFile:
         self.class_names = []  # Lista de nomes de classes
         self.is_god_class = False
         self.god_class_reasons = []
+        
+        # Motivo pelo qual a análise de complexidade foi pulada (None = análise completa)
+        self.parse_warning = None
+        
+        # Métricas por função (ver scan_function_metrics)
+        self.functions = []
+        self.content_hash = None
 
     @property
     def filename(self):
         return self.path.name
 
-    def parse(self):
+    def parse(self, timeout=PARSE_TIMEOUT_SECONDS, function_cache=None):
         with open(self.path, 'r', encoding='utf-8', errors='ignore') as f:
             content = f.read()
-            self.raw_imports = re.findall(r"^\s*import\s+['\"](.+?)['\"]", content, re.MULTILINE)
-            self.raw_exports = re.findall(r"^\s*export\s+['\"](.+?)['\"]", content, re.MULTILINE)
-            self._analyze_complexity(content)
-    
-    def _analyze_complexity(self, content):
+        self.raw_imports = IMPORT_RE.findall(content)
+        self.raw_exports = EXPORT_RE.findall(content)
         lines = content.split('\n')
+        self._count_lines_of_code(lines)
+
+        # Arquivos gerados/minificados: mantém imports/exports e LOC, pula as métricas
+        if len(content) > MAX_FILE_BYTES:
+            self._skip_complexity(f"Arquivo muito grande ({len(content)} bytes), provavelmente gerado")
+            return
+        longest_line = max(map(len, lines))
+        if longest_line > MAX_LINE_LENGTH:
+            self._skip_complexity(f"Linha muito longa ({longest_line} caracteres), provavelmente minificado")
+            return
+
+        try:
+            with parse_time_guard(timeout):
+                self._analyze_complexity(content)
+                self._analyze_functions(content, function_cache)
+        except ParseTimeout:
+            self._skip_complexity(f"Análise excedeu {timeout}s")
+
+    def _skip_complexity(self, reason):
+        """Zera métricas parciais (exceto LOC) e registra por que o arquivo não foi analisado"""
+        self.num_classes = 0
+        self.num_functions = 0
+        self.num_widgets = 0
+        self.cyclomatic_complexity = 0
+        self.cognitive_complexity = 0
+        self.private_members = []
+        self.class_names = []
+        self.is_god_class = False
+        self.god_class_reasons = []
+        self.functions = []
+        self.content_hash = None
+        self.parse_warning = reason
+        print(f"Aviso: {self.rel_path}: {reason} - métricas ignoradas", file=sys.stderr)
+    
+    def _analyze_functions(self, content, function_cache):
+        """Métricas por função, reaproveitando o cache quando o conteúdo não mudou"""
+        import hashlib
+
+        self.content_hash = hashlib.sha1(content.encode('utf-8')).hexdigest()
+        if function_cache is not None and self.content_hash in function_cache:
+            self.functions = function_cache[self.content_hash]
+            return
+        self.functions = scan_function_metrics(content)
+        if function_cache is not None:
+            function_cache[self.content_hash] = self.functions
+
+    def _count_lines_of_code(self, lines):
+        self.lines_of_code = 0
         for line in lines:
             stripped = line.strip()
             if stripped and not stripped.startswith(('//', '/*', '*')):
                 self.lines_of_code += 1
-        
+
+    def _analyze_complexity(self, content):
+        lines = content.split('\n')
+
         # Extrai nomes de classes
-        class_matches = re.findall(r'\bclass\s+(\w+)', content)
+        class_matches = CLASS_NAME_RE.findall(content)
         self.class_names = class_matches
         self.num_classes = len(class_matches)
         
-        self.num_widgets = len(re.findall(r'\bclass\s+\w+\s+extends\s+(StatelessWidget|StatefulWidget|ConsumerWidget|HookWidget|ConsumerStatefulWidget)', content))
-        self.num_functions = len(re.findall(r'\b(void|Future|String|int|bool|double|Widget|List|Map|Set)\s+\w+\s*\([^)]*\)\s*(async\s*)?\{', content))
+        self.num_widgets = len(WIDGET_CLASS_RE.findall(content))
+        self.num_functions = len(FUNCTION_DECLARATION_RE.findall(content))
         
         # Extrai membros privados (classes, métodos, variáveis que começam com _)
-        self.private_members = list(set(re.findall(r'\b(_\w+)', content)))
+        self.private_members = sorted(set(PRIVATE_MEMBER_RE.findall(content)))
         
         # Complexidade Ciclomática simples
-        self.cyclomatic_complexity += len(re.findall(r'\bif\b', content))
-        self.cyclomatic_complexity += len(re.findall(r'\belse\b', content))
-        self.cyclomatic_complexity += len(re.findall(r'\bfor\b', content))
-        self.cyclomatic_complexity += len(re.findall(r'\bwhile\b', content))
-        self.cyclomatic_complexity += len(re.findall(r'\bcase\b', content))
-        self.cyclomatic_complexity += len(re.findall(r'\bcatch\b', content))
-        self.cyclomatic_complexity += len(re.findall(r'\?\?', content))
-        self.cyclomatic_complexity += len(re.findall(r'&&', content))
-        self.cyclomatic_complexity += len(re.findall(r'\|\|', content))
+        self.cyclomatic_complexity += len(DECISION_KEYWORD_RE.findall(content))
+        self.cyclomatic_complexity += len(LOGICAL_OPERATOR_RE.findall(content))
         self.cyclomatic_complexity += content.count('?')
         
         # Complexidade Cognitiva (Nesting)
@@ -185,11 +528,12 @@ class DartFile:
                 "classes": self.num_classes,
                 "widgets": self.num_widgets,
                 "methods": self.num_functions,
+                "max_function_complexity": max((fn["complexity"] for fn in self.functions), default=0),
             },
             "dependency_graph": {
                 "imports_count": len(self.resolved_imports),
                 "used_by_count": len(self.used_by),
-                "used_by": [str(p.relative_to(self.root_path)).replace('\\', '/') for p in self.used_by]
+                "used_by": [str(p.relative_to(self.root_path)).replace('\\', '/') for p in sorted(self.used_by)]
             },
             "code_smells": {
                 "is_god_class": self.is_god_class,
@@ -198,6 +542,47 @@ class DartFile:
         }
         return result
 
+    def to_facts(self):
+        """Serializa os fatos locais do arquivo (sem resolução) para um shard"""
+        return {
+            "path": str(self.rel_path).replace('\\', '/'),
+            "imports": self.raw_imports,
+            "exports": self.raw_exports,
+            "loc": self.lines_of_code,
+            "classes": self.num_classes,
+            "functions": self.num_functions,
+            "widgets": self.num_widgets,
+            "complexity": self.cyclomatic_complexity,
+            "cognitive_complexity": self.cognitive_complexity,
+            "private_members": self.private_members,
+            "class_names": self.class_names,
+            "parse_warning": self.parse_warning,
+            "is_god_class": self.is_god_class,
+            "god_class_reasons": self.god_class_reasons,
+            "function_metrics": self.functions,
+        }
+
+    @classmethod
+    def from_facts(cls, facts, package_name, root_path):
+        """Reconstrói um DartFile a partir dos fatos gravados em um shard"""
+        dart_file = cls(root_path / facts["path"], package_name, root_path)
+        dart_file.raw_imports = facts["imports"]
+        dart_file.raw_exports = facts["exports"]
+        dart_file.lines_of_code = facts["loc"]
+        dart_file.num_classes = facts["classes"]
+        dart_file.num_functions = facts["functions"]
+        dart_file.num_widgets = facts["widgets"]
+        dart_file.cyclomatic_complexity = facts["complexity"]
+        dart_file.cognitive_complexity = facts["cognitive_complexity"]
+        dart_file.private_members = facts["private_members"]
+        dart_file.class_names = facts["class_names"]
+        dart_file.parse_warning = facts["parse_warning"]
+        dart_file.functions = facts["function_metrics"]
+        # Restaurado, não recalculado: arquivos pulados pelo parser mantêm LOC mas não são god classes
+        dart_file.is_god_class = facts["is_god_class"]
+        dart_file.god_class_reasons = facts["god_class_reasons"]
+        return dart_file
+
 def get_package_name(root_path):
     pubspec_path = root_path / 'pubspec.yaml'
     if not pubspec_path.exists():
@@ -258,6 +643,124 @@ def generate_directory_structure(root_path, ignore_patterns, include_files=True)
     
     return build_tree(lib_path)
 
+def aggregate_directory_metrics(files, module_depth=DEFAULT_MODULE_DEPTH):
+    """Agrega métricas por diretório em uma única passada de baixo para cima
+
+    Cada arquivo soma nas métricas do próprio diretório e cada import resolvido
+    é registrado como aresta interna no ancestral comum mais próximo das duas
+    pontas. Depois, os diretórios são acumulados nos pais do mais profundo ao
+    mais raso, obtendo os totais de cada subárvore sem reprocessar arquivos.
+
+    Args:
+        files: DartFiles a agregar (ex: files_to_report.values())
+        module_depth: Nº de componentes do caminho que define um módulo na matriz
+            de acoplamento (3 = lib/features/<feature>)
+
+    Returns:
+        Tupla (directory_metrics, module_coupling)
+    """
+    directories = {}
+    module_edges = {}
+
+    def directory_of(path, root_path):
+        try:
+            return Path(path).relative_to(root_path).parent.as_posix()
+        except ValueError:
+            return Path(path).parent.as_posix()
+
+    def ensure(directory):
+        # Cria a entrada e a cadeia de ancestrais que ainda não existe
+        while directory not in directories:
+            directories[directory] = {
+                "files": 0, "loc": 0,
+                "complexity_sum": 0, "complexity_max": 0,
+                "cognitive_complexity_sum": 0, "cognitive_complexity_max": 0,
+                "max_function_complexity": 0,
+                "edges_from": 0, "edges_to": 0, "internal_edges": 0,
+            }
+            if '/' not in directory:
+                break
+            directory = directory.rsplit('/', 1)[0]
+        return directories[directory]
+
+    for f in files:
+        source_dir = directory_of(f.path, f.root_path)
+        ensure(source_dir)
+        entry = directories[source_dir]
+        entry["files"] += 1
+        entry["loc"] += f.lines_of_code
+        entry["complexity_sum"] += f.cyclomatic_complexity
+        entry["complexity_max"] = max(entry["complexity_max"], f.cyclomatic_complexity)
+        entry["cognitive_complexity_sum"] += f.cognitive_complexity
+        entry["cognitive_complexity_max"] = max(entry["cognitive_complexity_max"], f.cognitive_complexity)
+        entry["max_function_complexity"] = max(
+            entry["max_function_complexity"], max((fn["complexity"] for fn in f.functions), default=0)
+        )
+
+        source_parts = source_dir.split('/')
+        source_module = '/'.join(source_parts[:module_depth])
+        for imported_path in f.resolved_imports:
+            target_dir = directory_of(imported_path, f.root_path)
+            ensure(target_dir)
+            entry["edges_from"] += 1
+            directories[target_dir]["edges_to"] += 1
+
+            # Ancestral comum mais próximo: a aresta é interna a ele (e aos seus pais)
+            target_parts = target_dir.split('/')
+            common = 0
+            for a, b in zip(source_parts, target_parts):
+                if a != b:
+                    break
+                common += 1
+            if common:
+                directories['/'.join(source_parts[:common])]["internal_edges"] += 1
+
+            target_module = '/'.join(target_parts[:module_depth])
+            if target_module != source_module:
+                key = (source_module, target_module)
+                module_edges[key] = module_edges.get(key, 0) + 1
+
+    # Acumulação de baixo para cima: filhos antes dos pais
+    for directory in sorted(directories, key=lambda d: d.count('/'), reverse=True):
+        if '/' not in directory:
+            continue
+        child = directories[directory]
+        parent = directories[directory.rsplit('/', 1)[0]]
+        for key in ("files", "loc", "complexity_sum", "cognitive_complexity_sum", "edges_from", "edges_to", "internal_edges"):
+            parent[key] += child[key]
+        for key in ("complexity_max", "cognitive_complexity_max", "max_function_complexity"):
+            parent[key] = max(parent[key], child[key])
+
+    directory_metrics = [{
+        "path": directory,
+        "depth": directory.count('/') + 1,
+        "metrics": {
+            "files": entry["files"],
+            "loc": entry["loc"],
+            "complexity_sum": entry["complexity_sum"],
+            "complexity_max": entry["complexity_max"],
+            "cognitive_complexity_sum": entry["cognitive_complexity_sum"],
+            "cognitive_complexity_max": entry["cognitive_complexity_max"],
+            "max_function_complexity": entry["max_function_complexity"],
+        },
+        "dependency_graph": {
+            "internal_edges": entry["internal_edges"],
+            "outgoing_edges": entry["edges_from"] - entry["internal_edges"],
+            "incoming_edges": entry["edges_to"] - entry["internal_edges"],
+        }
+    } for directory, entry in sorted(directories.items())]
+
+    module_coupling = {
+        "depth": module_depth,
+        "edges": [{
+            "from": source,
+            "to": target,
+            "imports": count
+        } for (source, target), count in sorted(module_edges.items(), key=lambda x: (-x[1], x[0]))]
+    }
+
+    return directory_metrics, module_coupling
+
 def format_tree_markdown(tree, prefix="", is_last=True):
     """Formata árvore de diretórios para Markdown (apenas pastas)"""
     lines = []
@@ -276,6 +779,125 @@ def format_tree_markdown(tree, prefix="", is_last=True):
     
     return lines
 
+def _stdout_supports_color():
+    """Cores ANSI só em terminal interativo, sem NO_COLOR e, no Windows, com VT ativo
+
+    No Windows tenta ativar ENABLE_VIRTUAL_TERMINAL_PROCESSING no console; se o
+    console não suportar (consoles antigos), a saída fica sem cores.
+    """
+    if not sys.stdout.isatty() or os.environ.get('NO_COLOR'):
+        return False
+    if sys.platform != 'win32':
+        return True
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        enable_vt_processing = 0x0004
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = wintypes.DWORD()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        if mode.value & enable_vt_processing:
+            return True
+        return bool(kernel32.SetConsoleMode(handle, mode.value | enable_vt_processing))
+    except (AttributeError, OSError):
+        return False
+
+def _colorize(text, kind):
+    return f"\033[{JSON_COLORS[kind]}m{text}\033[0m"
+
+def iter_json_chunks(obj, indent=2, color=False, _level=0):
+    """Gera o JSON em fragmentos, com indentação e cores ANSI opcionais
+
+    Args:
+        obj: Estrutura a serializar (dict, list, str, números, bool, None)
+        indent: Espaços por nível. None gera a forma compacta
+        color: Se True, envolve cada token com códigos de cor ANSI
+
+    Yields:
+        Fragmentos de texto que, concatenados, formam o documento JSON
+    """
+    paint = _colorize if color else (lambda text, kind: text)
+
+    if isinstance(obj, str):
+        yield paint(json.encoder.encode_basestring_ascii(obj), "string")
+        return
+    if obj is None:
+        yield paint("null", "null")
+        return
+    if obj is True or obj is False:
+        yield paint(json.dumps(obj), "true" if obj else "false")
+        return
+    if isinstance(obj, (int, float)):
+        yield paint(json.dumps(obj), "number")
+        return
+
+    if isinstance(obj, dict):
+        items, open_char, close_char, kind = list(obj.items()), "{", "}", "object"
+    elif isinstance(obj, (list, tuple)):
+        items, open_char, close_char, kind = obj, "[", "]", "array"
+    else:
+        raise TypeError(f"Tipo não serializável em JSON: {type(obj).__name__}")
+
+    if not items:
+        yield paint(open_char + close_char, kind)
+        return
+
+    if indent is None:
+        item_sep, key_sep, inner, outer = ",", ":", "", ""
+    else:
+        inner = "\n" + " " * (indent * (_level + 1))
+        outer = "\n" + " " * (indent * _level)
+        item_sep, key_sep = ",", ": "
+
+    yield paint(open_char, kind)
+    for i, item in enumerate(items):
+        yield (paint(item_sep, kind) if i else "") + inner
+        if kind == "object":
+            key, value = item
+            yield paint(json.encoder.encode_basestring_ascii(str(key)), "key")
+            yield paint(key_sep, kind)
+            item = value
+        yield from iter_json_chunks(item, indent, color, _level + 1)
+    yield outer + paint(close_char, kind)
+
+class ChunkedWriter:
+    """Acumula texto e escreve no stream em blocos de OUTPUT_CHUNK_SIZE"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer = []
+        self.buffered = 0
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.buffered += len(text)
+        if self.buffered >= OUTPUT_CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.stream.write(''.join(self.buffer))
+            self.buffer = []
+            self.buffered = 0
+
+def write_json_stream(obj, stream, compact=False, color=False):
+    """Escreve o JSON diretamente no stream em blocos, sem montar a string completa"""
+    if color:
+        chunks = iter_json_chunks(obj, None if compact else 2, color=True)
+    elif compact:
+        chunks = json.JSONEncoder(separators=(',', ':')).iterencode(obj)
+    else:
+        chunks = json.JSONEncoder(indent=2).iterencode(obj)
+
+    writer = ChunkedWriter(stream)
+    for chunk in chunks:
+        writer.write(chunk)
+    writer.write('\n')
+    writer.flush()
+
 def generate_recommendations(god_classes, dead_code, duplicates, violations, circular_deps, highly_coupled, high_complexity):
     """Gera recomendações priorizadas e acionáveis para refatoração"""
     recommendations = []
@@ -354,8 +976,10 @@ def generate_recommendations(god_classes, dead_code, duplicates, violations, cir
     
     return recommendations
 
-def generate_json_report(files_to_report, root_path, package_name, ignored_count, is_partial_analysis, circular_deps, ignore_patterns, output_mode='file', output_file=None):
+def generate_json_report(files_to_report, root_path, package_name, ignored_count, is_partial_analysis, circular_deps, ignore_patterns, output_mode='file', output_file=None, compact=False, gzip_output=False, top_functions=TOP_FUNCTIONS_COUNT, module_depth=DEFAULT_MODULE_DEPTH, color=True):
     """Gera o relatório em formato JSON otimizado para IA"""
+    import gzip
+    from datetime import datetime
     
     if output_file is None:
         output_file = DEFAULT_OUTPUT_NAME
@@ -365,6 +989,7 @@ def generate_json_report(files_to_report, root_path, package_name, ignored_count
     
     # Prepara os dados
     files_list = [f.to_dict() for f in files_to_report.values()]
+    directory_metrics, module_coupling = aggregate_directory_metrics(files_to_report.values(), module_depth)
     
     # Identifica Hotspots para a IA (apenas dentro do escopo analisado)
     hotspots = []
@@ -459,7 +1084,11 @@ def generate_json_report(files_to_report, root_path, package_name, ignored_count
             "project": package_name,
             "analysis_date": datetime.now().isoformat(),
             "generator": "Static Dart Analyzer v0.0.1",
-            "scope": "Partial (Selected Files)" if is_partial_analysis else "Full Project"
+            "scope": "Partial (Selected Files)" if is_partial_analysis else "Full Project",
+            "parse_warnings": [{
+                "path": str(f.rel_path).replace('\\', '/'),
+                "reason": f.parse_warning
+            } for f in files_to_report.values() if f.parse_warning]
         },
         "project_structure": directory_structure,
         "summary_kpis": {
@@ -501,126 +1130,424 @@ def generate_json_report(files_to_report, root_path, package_name, ignored_count
             layer_violations, circular_deps, highly_coupled, high_complexity_files
         ),
         "hotspots_top_10": hotspots[:10],
+        "most_complex_functions": top_complex_functions(files_to_report.values(), top_functions),
+        "directory_metrics": directory_metrics,
+        "module_coupling": module_coupling,
         "files_inventory": files_list
     }
 
     if output_mode == 'stdout':
-        import sys
-        json_str = json.dumps(report_data, indent=2)
-        
+        if gzip_output:
+            print("Aviso: --gzip requer --output file; gerando JSON sem compressão.", file=sys.stderr)
         # Detecta se stdout está sendo redirecionado (pipe)
-        # Se sim, envia JSON puro para permitir pipe com jq externo
-        is_piped = not sys.stdout.isatty()
-        
-        if is_piped:
-            # Saída está sendo redirecionada/pipe - envia JSON puro
-            print(json_str)
-        elif shutil.which('jq'):
-            # Terminal interativo com jq disponível - usa colorização
-            try:
-                process = subprocess.Popen(
-                    ['jq', '.'],
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
-                )
-                stdout, stderr = process.communicate(input=json_str)
-                if process.returncode == 0:
-                    print(stdout, end='')
-                else:
-                    print(json_str)
-            except Exception:
-                print(json_str)
-        else:
-            # Terminal interativo sem jq - JSON puro
-            print(json_str)
+        # Se sim, envia JSON puro para permitir pipe com jq externo;
+        # em terminal interativo, coloriza no mesmo esquema do jq
+        # (exceto com --no-color, NO_COLOR ou console Windows sem VT)
+        write_json_stream(report_data, sys.stdout, compact=compact, color=color and _stdout_supports_color())
     else:
-        output_path = root_path / f"{output_file}.json"
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, indent=2)
+        if gzip_output:
+            output_path = root_path / f"{output_file}.json.gz"
+            f = gzip.open(output_path, 'wt', encoding='utf-8')
+        else:
+            output_path = root_path / f"{output_file}.json"
+            f = open(output_path, 'w', encoding='utf-8')
+        with f:
+            write_json_stream(report_data, f, compact=compact)
         print(f"Relatório JSON gerado: {output_path}")
 
-def generate_markdown_report(files_to_report, root_path, package_name, ignored_count, is_partial_analysis, ignore_patterns, output_mode='file', output_file=None):
-    if output_file is None:
-        output_file = DEFAULT_OUTPUT_NAME
-    
+def _markdown_page_names(directories):
+    """Nome do arquivo da página de cada diretório (lib/core/utils -> lib__core__utils.md)
+
+    Diretórios cujo nome achatado coincide (ex: `lib/a__b` e `lib/a/b`) ou que
+    colidiriam com o index.md recebem um sufixo com o hash do caminho.
+    """
+    import zlib
+
+    flat_names = {directory: directory.replace('/', '__') for directory in directories}
+    counts = {}
+    for name in flat_names.values():
+        counts[name] = counts.get(name, 0) + 1
+
+    page_names = {}
+    for directory, name in flat_names.items():
+        if counts[name] > 1 or name == 'index':
+            name = f"{name}-{zlib.crc32(directory.encode('utf-8')):08x}"
+        page_names[directory] = name + '.md'
+    return page_names
+
+def _write_markdown_overview(write, files_to_report, root_path, package_name, is_partial_analysis, ignore_patterns, top_functions, module_depth, pages=None):
+    """Seções gerais do relatório; com `pages`, inclui o índice das páginas por diretório"""
+    from datetime import datetime
+
     # Gera estrutura de diretórios (apenas pastas)
     directory_structure = generate_directory_structure(root_path, ignore_patterns, include_files=False)
     
     sorted_by_usage = sorted(files_to_report.values(), key=lambda x: len(x.used_by), reverse=True)
     top_critical = sorted_by_usage[:15]
-    
-    orphans = []
-    whitelist = ['main.dart', 'firebase_options.dart', 'bootstrap.dart']
-    for f in sorted_by_usage:
-        if len(f.used_by) == 0 and f.filename not in whitelist:
-            orphans.append(f)
 
-    # Gera o conteúdo markdown
-    content = []
-    content.append(f"# Relatório de Arquitetura: {package_name}\n")
-    content.append(f"**Data:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-    content.append(f"**Escopo:** {'Análise Parcial (Arquivos Selecionados)' if is_partial_analysis else 'Projeto Completo'}\n\n")
+    write(f"# Relatório de Arquitetura: {package_name}\n")
+    write(f"**Data:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    write(f"**Escopo:** {'Análise Parcial (Arquivos Selecionados)' if is_partial_analysis else 'Projeto Completo'}\n\n")
     
-    content.append("## 🤖 Contexto\n")
-    content.append("Este relatório foca apenas nos arquivos solicitados, mas calcula referências globais (quem usa estes arquivos).\n\n")
+    write("## 🤖 Contexto\n")
+    write("Este relatório foca apenas nos arquivos solicitados, mas calcula referências globais (quem usa estes arquivos).\n\n")
     
     # Adiciona estrutura de pastas
-    content.append("## 📁 Estrutura de Pastas\n")
-    content.append("```\n")
-    content.append("lib/\n")
+    write("## 📁 Estrutura de Pastas\n")
+    write("```\n")
+    write("lib/\n")
     if directory_structure:
-        tree_lines = format_tree_markdown(directory_structure)
-        for line in tree_lines:
-            content.append(line + "\n")
+        for line in format_tree_markdown(directory_structure):
+            write(line + "\n")
     else:
-        content.append("(estrutura vazia ou inacessível)\n")
-    content.append("```\n\n")
+        write("(estrutura vazia ou inacessível)\n")
+    write("```\n\n")
 
-    content.append("## 🔥 Arquivos Críticos (no escopo selecionado)\n")
+    write("## 🔥 Arquivos Críticos (no escopo selecionado)\n")
     if top_critical:
         for f in top_critical:
-            content.append(f"- `{f.rel_path}` (**{len(f.used_by)}** refs | Complexidade: {f.cyclomatic_complexity})\n")
+            write(f"- `{f.rel_path}` (**{len(f.used_by)}** refs | Complexidade: {f.cyclomatic_complexity})\n")
     else:
-        content.append("Nenhum arquivo no escopo.\n")
-        
-    content.append(f"\n## 📑 Detalhamento ({len(files_to_report)} arquivos)\n")
-    sorted_alpha = sorted(files_to_report.values(), key=lambda x: str(x.rel_path))
-    
-    for f in sorted_alpha:
+        write("Nenhum arquivo no escopo.\n")
+
+    write("\n## 🧩 Funções Mais Complexas\n")
+    complex_functions = top_complex_functions(files_to_report.values(), top_functions)
+    if complex_functions:
+        for fn in complex_functions:
+            owner = f"{fn['class']}." if fn['class'] else ""
+            write(f"- `{owner}{fn['function']}` em `{fn['path']}:{fn['line']}` (Complexidade: {fn['complexity']} | Cognitiva: {fn['cognitive_complexity']} | Aninhamento: {fn['max_nesting']} | LOC: {fn['loc']})\n")
+    else:
+        write("Nenhuma função encontrada.\n")
+
+    directory_metrics, module_coupling = aggregate_directory_metrics(files_to_report.values(), module_depth)
+    modules = [d for d in directory_metrics if d["depth"] == module_depth]
+    write(f"\n## 🗂️ Métricas por Módulo (profundidade {module_depth})\n")
+    if modules:
+        write("| Módulo | Arquivos | LOC | Ciclo (soma/máx) | Arestas internas | Saída | Entrada |\n")
+        write("|---|---|---|---|---|---|---|\n")
+        for d in modules:
+            m, g = d["metrics"], d["dependency_graph"]
+            write(f"| `{d['path']}` | {m['files']} | {m['loc']} | {m['complexity_sum']}/{m['complexity_max']} | {g['internal_edges']} | {g['outgoing_edges']} | {g['incoming_edges']} |\n")
+        if module_coupling["edges"]:
+            write("\n**Maior acoplamento entre módulos:**\n")
+            for edge in module_coupling["edges"][:10]:
+                write(f"- `{edge['from']}` → `{edge['to']}` ({edge['imports']} imports)\n")
+    else:
+        write("Nenhum módulo nesta profundidade.\n")
+
+    if pages is not None:
+        write(f"\n## 📑 Detalhamento por Diretório ({len(files_to_report)} arquivos)\n")
+        for directory, page_name, count in pages:
+            write(f"- [`{directory}`]({page_name}) ({count} arquivos)\n")
+
+def _write_markdown_file_details(write, files, rel_path_of):
+    """Seção de detalhes de cada arquivo (em ordem alfabética)"""
+    for f in sorted(files, key=lambda x: str(x.rel_path)):
         usage = len(f.used_by)
-        content.append(f"### `{f.rel_path}`\n")
-        content.append(f"- **Métricas:** LOC: {f.lines_of_code} | Ciclo: {f.cyclomatic_complexity} | Cognitiva: {f.cognitive_complexity}\n")
+        write(f"### `{f.rel_path}`\n")
+        write(f"- **Métricas:** LOC: {f.lines_of_code} | Ciclo: {f.cyclomatic_complexity} | Cognitiva: {f.cognitive_complexity}\n")
+        if f.parse_warning:
+            write(f"- ⚠️ **Métricas ignoradas:** {f.parse_warning}\n")
         if usage > 0:
-            content.append(f"- **Usado por ({usage}):**\n")
-            # Limita a 10 refs para não poluir
-            for consumer in sorted(list(f.used_by))[:10]:
-                try:
-                    consumer_rel = Path(consumer).relative_to(root_path)
-                    content.append(f"  - `{consumer_rel}`\n")
-                except:
-                    content.append(f"  - `{consumer}`\n")
+            write(f"- **Usado por ({usage}):**\n")
+            # Limita a 10 refs para não poluir (heap em vez de ordenar todo o used_by)
+            for consumer in heapq.nsmallest(10, f.used_by):
+                write(f"  - `{rel_path_of(consumer)}`\n")
             if usage > 10:
-                content.append(f"  - ... e mais {usage - 10}\n")
+                write(f"  - ... e mais {usage - 10}\n")
         else:
-            content.append("- _Sem referências diretas._\n")
-        content.append("\n")
+            write("- _Sem referências diretas._\n")
+        write("\n")
+
+def generate_markdown_report(files_to_report, root_path, package_name, ignored_count, is_partial_analysis, ignore_patterns, output_mode='file', output_file=None, top_functions=TOP_FUNCTIONS_COUNT, module_depth=DEFAULT_MODULE_DEPTH, split=False):
+    """Gera o relatório Markdown escrevendo em blocos direto no destino
+
+    Com `split` (apenas em arquivo), gera a pasta `output_file/` com um index.md
+    e uma página por diretório com o detalhamento dos seus arquivos.
+    """
+    if output_file is None:
+        output_file = DEFAULT_OUTPUT_NAME
+
+    # Caminhos relativos calculados uma única vez por arquivo, não por referência
+    rel_paths = {}
+
+    def rel_path_of(path):
+        if path not in rel_paths:
+            try:
+                rel_paths[path] = str(Path(path).relative_to(root_path))
+            except ValueError:
+                rel_paths[path] = str(path)
+        return rel_paths[path]
+
+    if split and output_mode == 'stdout':
+        print("Aviso: --split requer --output file; gerando relatório único.", file=sys.stderr)
+        split = False
+
+    if split:
+        output_dir = root_path / output_file
+        output_dir.mkdir(exist_ok=True)
+
+        files_by_directory = {}
+        for f in files_to_report.values():
+            files_by_directory.setdefault(f.rel_path.parent.as_posix(), []).append(f)
+        page_names = _markdown_page_names(files_by_directory)
+        pages = sorted((directory, page_names[directory], len(files)) for directory, files in files_by_directory.items())
+
+        # Remove apenas páginas geradas em execuções anteriores (listadas no manifesto)
+        # para diretórios que não existem mais; outros .md da pasta são preservados
+        manifest_path = output_dir / MARKDOWN_PAGES_MANIFEST
+        current_pages = {'index.md'} | set(page_names.values())
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                previous_pages = json.load(f)
+        except (OSError, ValueError):
+            previous_pages = []
+        for page_name in previous_pages:
+            if not isinstance(page_name, str) or page_name in current_pages:
+                continue
+            if Path(page_name).name == page_name and page_name.endswith('.md'):
+                try:
+                    (output_dir / page_name).unlink()
+                except FileNotFoundError:
+                    pass
+
+        for directory, page_name, count in pages:
+            with open(output_dir / page_name, 'w', encoding='utf-8') as md:
+                writer = ChunkedWriter(md)
+                writer.write(f"# `{directory}`\n")
+                writer.write("[← Índice](index.md)\n\n")
+                writer.write(f"## 📑 Detalhamento ({count} arquivos)\n")
+                _write_markdown_file_details(writer.write, files_by_directory[directory], rel_path_of)
+                writer.flush()
+
+        output_path = output_dir / 'index.md'
+        with open(output_path, 'w', encoding='utf-8') as md:
+            writer = ChunkedWriter(md)
+            _write_markdown_overview(writer.write, files_to_report, root_path, package_name, is_partial_analysis, ignore_patterns, top_functions, module_depth, pages)
+            writer.flush()
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(sorted(current_pages), f, indent=2)
+        print(f"Relatório Markdown gerado: {output_path} (+{len(pages)} páginas por diretório)")
+        return
+
+    def write_report(stream):
+        writer = ChunkedWriter(stream)
+        _write_markdown_overview(writer.write, files_to_report, root_path, package_name, is_partial_analysis, ignore_patterns, top_functions, module_depth)
+        writer.write(f"\n## 📑 Detalhamento ({len(files_to_report)} arquivos)\n")
+        _write_markdown_file_details(writer.write, files_to_report.values(), rel_path_of)
+        writer.flush()
 
-    markdown_content = ''.join(content)
-    
     if output_mode == 'stdout':
         # Para Windows PowerShell: usa UTF-8 com errors='replace'
-        import sys
         if sys.platform == 'win32':
             sys.stdout.reconfigure(encoding='utf-8')
-        print(markdown_content)
+        write_report(sys.stdout)
+        print()
     else:
         output_path = root_path / f"{output_file}.md"
         with open(output_path, 'w', encoding='utf-8') as md:
-            md.write(markdown_content)
+            write_report(md)
         print(f"Relatório Markdown gerado: {output_path}")
 
+def build_collapsed_graph(files, package_name, depth=0, include_packages=False):
+    """Monta o grafo de dependências já colapsado, sem materializar as arestas brutas
+
+    Args:
+        files: DartFiles de origem das arestas (ex: files_to_report.values())
+        depth: Componentes do caminho do diretório que formam um nó
+            (0 = um nó por arquivo, 3 = lib/features/<feature>)
+        include_packages: Se True, cada pacote externo (package:x) vira um nó
+
+    Returns:
+        Tupla (nodes, edges): nodes {id: atributos} e edges {(origem, destino): peso}.
+        Arestas paralelas viram peso e arestas internas a um nó são descartadas.
+    """
+    nodes = {}
+    edges = {}
+
+    def node_of(path, root_path):
+        try:
+            rel = Path(path).relative_to(root_path)
+        except ValueError:
+            rel = Path(path)
+        if depth <= 0:
+            return rel.as_posix()
+        return '/'.join(rel.parent.parts[:depth])
+
+    def ensure(node, kind="module"):
+        if node not in nodes:
+            nodes[node] = {"kind": kind, "files": 0, "loc": 0, "complexity": 0, "hotspot": False}
+        return nodes[node]
+
+    def add_edge(source, target):
+        if source != target:
+            edges[(source, target)] = edges.get((source, target), 0) + 1
+
+    own_prefix = f'package:{package_name}/'
+    for f in files:
+        source = node_of(f.path, f.root_path)
+        node = ensure(source, "file" if depth <= 0 else "module")
+        node["files"] += 1
+        node["loc"] += f.lines_of_code
+        node["complexity"] += f.cyclomatic_complexity
+        if len(f.used_by) * f.cyclomatic_complexity > 100:
+            node["hotspot"] = True
+
+        for imported_path in f.resolved_imports:
+            target = node_of(imported_path, f.root_path)
+            ensure(target, "file" if depth <= 0 else "module")
+            add_edge(source, target)
+
+        if include_packages:
+            for imp in f.raw_imports:
+                if imp.startswith('package:') and not imp.startswith(own_prefix):
+                    target = imp.split('/', 1)[0]
+                    ensure(target, "package")
+                    add_edge(source, target)
+
+    return nodes, edges
+
+def find_strongly_connected_components(nodes, edges):
+    """Tarjan iterativo: mapeia cada nó que está em um ciclo para o id do seu SCC"""
+    adjacency = {node: [] for node in nodes}
+    for source, target in edges:
+        adjacency[source].append(target)
+
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    components = {}
+    counter = 0
+    component_id = 0
+
+    for start in sorted(nodes):
+        if start in index:
+            continue
+        work = [(start, iter(adjacency[start]))]
+        index[start] = lowlink[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start)
+
+        while work:
+            node, neighbors = work[-1]
+            advanced = False
+            for neighbor in neighbors:
+                if neighbor not in index:
+                    index[neighbor] = lowlink[neighbor] = counter
+                    counter += 1
+                    stack.append(neighbor)
+                    on_stack.add(neighbor)
+                    work.append((neighbor, iter(adjacency[neighbor])))
+                    advanced = True
+                    break
+                if neighbor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[neighbor])
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                members = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    members.append(member)
+                    if member == node:
+                        break
+                if len(members) > 1:
+                    for member in members:
+                        components[member] = component_id
+                    component_id += 1
+
+    return components
+
+def _dot_quote(text):
+    return '"' + str(text).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def write_dot_graph(stream, nodes, edges, components, highlight=False, name="dependencies"):
+    """Escreve o grafo no formato DOT (Graphviz), nó a nó e aresta a aresta"""
+    stream.write(f"digraph {_dot_quote(name)} {{\n")
+    stream.write('  rankdir=LR;\n  node [shape=box, style=filled, fillcolor="#ffffff"];\n')
+    for node_id in sorted(nodes):
+        node = nodes[node_id]
+        label = _dot_quote(node_id)
+        if node["kind"] == "module":
+            label = label[:-1] + f"\\n{node['files']} arquivos | {node['loc']} LOC\""
+        attrs = [f"label={label}"]
+        if node["kind"] == "package":
+            attrs.append('shape=ellipse, fillcolor="#eeeeee"')
+        elif highlight and node["hotspot"]:
+            attrs.append('fillcolor="#ffb347"')
+        if highlight and node_id in components:
+            attrs.append(f'color="#d62728", penwidth=2, tooltip="SCC {components[node_id]}"')
+        stream.write(f"  {_dot_quote(node_id)} [{', '.join(attrs)}];\n")
+    for (source, target), weight in sorted(edges.items()):
+        attrs = [f'weight={weight}', f'label="{weight}"'] if weight > 1 else []
+        if highlight and source in components and components.get(target) == components[source]:
+            attrs.append('color="#d62728"')
+        suffix = f" [{', '.join(attrs)}]" if attrs else ""
+        stream.write(f"  {_dot_quote(source)} -> {_dot_quote(target)}{suffix};\n")
+    stream.write("}\n")
+
+def write_graphml_graph(stream, nodes, edges, components, highlight=False):
+    """Escreve o grafo no formato GraphML, nó a nó e aresta a aresta"""
+    from xml.sax.saxutils import quoteattr
+
+    stream.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    stream.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+    keys = [
+        ("node", "kind", "string"), ("node", "files", "int"), ("node", "loc", "int"),
+        ("node", "complexity", "int"), ("node", "hotspot", "boolean"), ("node", "scc", "int"),
+        ("edge", "weight", "int"), ("edge", "in_cycle", "boolean"),
+    ]
+    for domain, key, kind in keys:
+        stream.write(f'  <key id="{key}" for="{domain}" attr.name="{key}" attr.type="{kind}"/>\n')
+    stream.write('  <graph id="dependencies" edgedefault="directed">\n')
+    for node_id in sorted(nodes):
+        node = nodes[node_id]
+        stream.write(f'    <node id={quoteattr(node_id)}>')
+        stream.write(f'<data key="kind">{node["kind"]}</data><data key="files">{node["files"]}</data>')
+        stream.write(f'<data key="loc">{node["loc"]}</data><data key="complexity">{node["complexity"]}</data>')
+        if highlight:
+            stream.write(f'<data key="hotspot">{str(node["hotspot"]).lower()}</data>')
+            if node_id in components:
+                stream.write(f'<data key="scc">{components[node_id]}</data>')
+        stream.write('</node>\n')
+    for (source, target), weight in sorted(edges.items()):
+        stream.write(f'    <edge source={quoteattr(source)} target={quoteattr(target)}><data key="weight">{weight}</data>')
+        if highlight:
+            in_cycle = source in components and components.get(target) == components[source]
+            stream.write(f'<data key="in_cycle">{str(in_cycle).lower()}</data>')
+        stream.write('</edge>\n')
+    stream.write('  </graph>\n</graphml>\n')
+
+def generate_graph_report(files_to_report, root_path, package_name, graph_format='dot', output_mode='file', output_file=None, depth=0, include_packages=False, highlight=False):
+    """Exporta o grafo de dependências (DOT ou GraphML), opcionalmente colapsado por diretório"""
+    if output_file is None:
+        output_file = DEFAULT_OUTPUT_NAME
+
+    nodes, edges = build_collapsed_graph(files_to_report.values(), package_name, depth, include_packages)
+    components = find_strongly_connected_components(nodes, edges) if highlight else {}
+
+    def write(stream):
+        if graph_format == 'graphml':
+            write_graphml_graph(stream, nodes, edges, components, highlight)
+        else:
+            write_dot_graph(stream, nodes, edges, components, highlight, package_name)
+
+    if output_mode == 'stdout':
+        write(sys.stdout)
+    else:
+        output_path = root_path / f"{output_file}.{graph_format}"
+        with open(output_path, 'w', encoding='utf-8') as f:
+            write(f)
+        print(f"Grafo {graph_format.upper()} gerado: {output_path} ({len(nodes)} nós, {len(edges)} arestas)")
+
 def detect_circular_dependencies(all_files):
     """Detecta dependências circulares no grafo de dependências"""
     circular_deps = []
@@ -641,7 +1568,7 @@ def detect_circular_dependencies(all_files):
         
         if current_path in all_files:
             current_file = all_files[current_path]
-            for imported_path in current_file.resolved_imports:
+            for imported_path in sorted(current_file.resolved_imports):
                 cycle = find_cycle(start_path, imported_path, visited, stack[:])
                 if cycle:
                     return cycle
@@ -673,27 +1600,15 @@ def detect_circular_dependencies(all_files):
     
     return circular_deps
 
-def analyze_project(root_path_str, output_format='md', target_files=None, output_mode='file'):
-    root_path = Path(root_path_str).resolve()
-    package_name = get_package_name(root_path)
-    
-    if not package_name:
-        print("Erro: pubspec.yaml não encontrado.", file=sys.stderr if output_mode == 'stdout' else sys.stdout)
-        return
+def scan_project_files(root_path, package_name, ignore_patterns):
+    """Varre lib/ e cria um DartFile (ainda não parseado) por arquivo .dart
 
-    # Carrega padrões de ignore
-    ignore_patterns = load_ignore_patterns(root_path)
-    
-    print(f"Iniciando análise completa para resolver dependências...", file=sys.stderr if output_mode == 'stdout' else sys.stdout)
-    
-    # 1. SCAN GLOBAL (Sempre necessário para resolver dependências reversas corretamente)
+    Returns:
+        Tupla (all_files, ignored_count). A ordem de all_files é a ordem do os.walk
+    """
     all_files = {}
     ignored_count = 0
     lib_path = root_path / 'lib'
-    
-    if not lib_path.exists():
-        print("Erro: Pasta /lib não encontrada.", file=sys.stderr if output_mode == 'stdout' else sys.stdout)
-        return
 
     for root, dirs, files in os.walk(lib_path):
         for file in files:
@@ -705,13 +1620,17 @@ def analyze_project(root_path_str, output_format='md', target_files=None, output
                 dart_file = DartFile(full_path, package_name, root_path)
                 all_files[full_path.resolve()] = dart_file
 
-    # 2. Parse Global
-    for f in all_files.values():
-        f.parse()
+    return all_files, ignored_count
+
+def link_dependency_graph(all_files):
+    """Resolve imports/exports, propaga exports, monta o used_by e detecta ciclos
+
+    Etapa global: precisa de todos os arquivos já parseados (ou carregados de shards).
+    """
     for f in all_files.values():
         f.resolve_paths(all_files)
 
-    # 3. Propagação de Exports Global
+    # Propagação de Exports Global
     effective_exports = {path: obj.resolved_exports.copy() for path, obj in all_files.items()}
     changed = True
     while changed:
@@ -725,7 +1644,7 @@ def analyze_project(root_path_str, output_format='md', target_files=None, output
                 exports.update(to_add)
                 changed = True
 
-    # 4. Cruzamento Global (Used By)
+    # Cruzamento Global (Used By)
     for consumer_path, consumer_obj in all_files.items():
         for imported_path in consumer_obj.resolved_imports:
             if imported_path in all_files:
@@ -734,37 +1653,341 @@ def analyze_project(root_path_str, output_format='md', target_files=None, output
                 for deep_exported_path in effective_exports[imported_path]:
                     if deep_exported_path in all_files:
                         all_files[deep_exported_path].used_by.add(consumer_path)
-    
-    # 4.5. Detecção de Circular Dependencies
-    circular_deps = detect_circular_dependencies(all_files)
 
-    # 5. FILTRAGEM (Selecionar apenas o que o usuário pediu para relatar)
+    # Detecção de Circular Dependencies
+    return detect_circular_dependencies(all_files)
+
+def filter_files_to_report(all_files, target_files, output_mode='file'):
+    """Seleciona apenas os arquivos que o usuário pediu para relatar
+
+    Returns:
+        Tupla (files_to_report, is_partial_analysis)
+    """
+    if not target_files:
+        return all_files, False
+
     files_to_report = {}
-    is_partial_analysis = False
+    print(f"Filtrando saída para {len(target_files)} arquivos...", file=sys.stderr if output_mode == 'stdout' else sys.stdout)
+    for t_file in target_files:
+        # Tenta resolver o caminho passado (relativo ou absoluto)
+        try:
+            # Remove aspas extras se houver e resolve caminho
+            clean_path = t_file.strip().strip("'").strip('"')
+            target_path = Path(clean_path).resolve()
+            
+            if target_path in all_files:
+                files_to_report[target_path] = all_files[target_path]
+            else:
+                print(f"Aviso: Arquivo solicitado não encontrado ou ignorado: {clean_path}", file=sys.stderr)
+        except Exception as e:
+            print(f"Erro ao processar caminho {t_file}: {e}", file=sys.stderr)
 
-    if target_files:
-        is_partial_analysis = True
-        print(f"Filtrando saída para {len(target_files)} arquivos...", file=sys.stderr if output_mode == 'stdout' else sys.stdout)
-        for t_file in target_files:
-            # Tenta resolver o caminho passado (relativo ou absoluto)
-            try:
-                # Remove aspas extras se houver e resolve caminho
-                clean_path = t_file.strip().strip("'").strip('"')
-                target_path = Path(clean_path).resolve()
-                
-                if target_path in all_files:
-                    files_to_report[target_path] = all_files[target_path]
-                else:
-                    print(f"Aviso: Arquivo solicitado não encontrado ou ignorado: {clean_path}", file=sys.stderr)
-            except Exception as e:
-                print(f"Erro ao processar caminho {t_file}: {e}", file=sys.stderr)
-    else:
-        files_to_report = all_files
+    return files_to_report, True
+
+def analyze_project(root_path_str, output_format='md', target_files=None, output_mode='file', parse_timeout=PARSE_TIMEOUT_SECONDS, use_cache=True):
+    root_path = Path(root_path_str).resolve()
+    package_name = get_package_name(root_path)
+    
+    if not package_name:
+        print("Erro: pubspec.yaml não encontrado.", file=sys.stderr if output_mode == 'stdout' else sys.stdout)
+        return
+
+    # Carrega padrões de ignore
+    ignore_patterns = load_ignore_patterns(root_path)
+    
+    print(f"Iniciando análise completa para resolver dependências...", file=sys.stderr if output_mode == 'stdout' else sys.stdout)
+    
+    if not (root_path / 'lib').exists():
+        print("Erro: Pasta /lib não encontrada.", file=sys.stderr if output_mode == 'stdout' else sys.stdout)
+        return
+
+    # 1. SCAN GLOBAL (Sempre necessário para resolver dependências reversas corretamente)
+    all_files, ignored_count = scan_project_files(root_path, package_name, ignore_patterns)
 
-    # 6. Output
+    # 2. Parse Global (métricas por função reaproveitadas do cache quando possível)
+    function_cache = load_function_cache(root_path) if use_cache else None
+    previous_cache = dict(function_cache or {})
+    for f in all_files.values():
+        f.parse(parse_timeout, function_cache)
+    if use_cache:
+        save_function_cache(root_path, all_files, previous_cache)
+
+    # 3. Resolução, propagação de exports, used_by e ciclos
+    circular_deps = link_dependency_graph(all_files)
+    # Índice do check é sempre atualizado (independe de --no-cache)
+    save_check_index(root_path, package_name, all_files, circular_deps)
+
+    # 4. FILTRAGEM (Selecionar apenas o que o usuário pediu para relatar)
+    files_to_report, is_partial_analysis = filter_files_to_report(all_files, target_files, output_mode)
+
+    # 5. Output
     return files_to_report, root_path, package_name, ignored_count, is_partial_analysis, circular_deps, ignore_patterns
 
-if __name__ == "__main__":
+def shard_for_path(rel_path, shard_count):
+    """Índice do shard de um arquivo: hash estável (crc32) do caminho relativo"""
+    import zlib
+
+    return zlib.crc32(rel_path.encode('utf-8')) % shard_count
+
+def analyze_shard(root_path_str, shard_index, shard_count, output_file=None, parse_timeout=PARSE_TIMEOUT_SECONDS, use_cache=True):
+    """Parseia apenas os arquivos do shard e grava seus fatos em disco
+
+    A resolução de dependências fica para o `merge`, que precisa do projeto inteiro.
+    """
+    import gzip
+
+    root_path = Path(root_path_str).resolve()
+    package_name = get_package_name(root_path)
+
+    if not package_name:
+        print("Erro: pubspec.yaml não encontrado.", file=sys.stderr)
+        return
+    if not (root_path / 'lib').exists():
+        print("Erro: Pasta /lib não encontrada.", file=sys.stderr)
+        return
+    if shard_count < 1 or not 0 <= shard_index < shard_count:
+        print(f"Erro: shard inválido ({shard_index} de {shard_count}).", file=sys.stderr)
+        return
+
+    if output_file is None:
+        output_file = DEFAULT_OUTPUT_NAME
+
+    ignore_patterns = load_ignore_patterns(root_path)
+    all_files, ignored_count = scan_project_files(root_path, package_name, ignore_patterns)
+
+    # Shards rodam em paralelo: o cache de funções é apenas lido, nunca gravado
+    function_cache = load_function_cache(root_path) if use_cache else None
+
+    # A ordem global do scan é gravada para que o merge reproduza a análise única
+    shard_files = []
+    for order, f in enumerate(all_files.values()):
+        facts_path = str(f.rel_path).replace('\\', '/')
+        if shard_for_path(facts_path, shard_count) == shard_index:
+            f.parse(parse_timeout, function_cache)
+            facts = f.to_facts()
+            facts["order"] = order
+            shard_files.append(facts)
+
+    shard_data = {
+        "format": SHARD_FORMAT,
+        "version": SHARD_VERSION,
+        "project": package_name,
+        "shard_index": shard_index,
+        "shard_count": shard_count,
+        "total_files": len(all_files),
+        "ignored_count": ignored_count,
+        "ignore_patterns": list(ignore_patterns),
+        "files": shard_files,
+    }
+
+    output_path = root_path / f"{output_file}.shard-{shard_index}-of-{shard_count}.json.gz"
+    with gzip.open(output_path, 'wt', encoding='utf-8') as f:
+        write_json_stream(shard_data, f, compact=True)
+    print(f"Shard {shard_index + 1}/{shard_count} gerado ({len(shard_files)} arquivos): {output_path}", file=sys.stderr)
+    return output_path
+
+def merge_shards(root_path_str, shard_paths, target_files=None, output_mode='file'):
+    """Combina shards e executa as etapas globais, como em analyze_project
+
+    Returns:
+        A mesma tupla de analyze_project, ou None se os shards forem inconsistentes
+    """
+    import gzip
+
+    root_path = Path(root_path_str).resolve()
+    shards = []
+    for shard_path in shard_paths:
+        try:
+            with gzip.open(shard_path, 'rt', encoding='utf-8') as f:
+                shard = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Erro: Não foi possível ler o shard {shard_path}: {e}", file=sys.stderr)
+            return
+        if shard.get("format") != SHARD_FORMAT or shard.get("version") != SHARD_VERSION:
+            print(f"Erro: {shard_path} não é um shard compatível.", file=sys.stderr)
+            return
+        shards.append(shard)
+
+    if not shards:
+        print("Erro: Nenhum shard informado.", file=sys.stderr)
+        return
+
+    first = shards[0]
+    for key in ("project", "shard_count", "total_files"):
+        if any(shard[key] != first[key] for shard in shards):
+            print(f"Erro: Shards de análises diferentes (campo '{key}' diverge).", file=sys.stderr)
+            return
+
+    indexes = sorted(shard["shard_index"] for shard in shards)
+    if indexes != list(range(first["shard_count"])):
+        print(f"Erro: Shards incompletos ou duplicados: {indexes} (esperado 0..{first['shard_count'] - 1}).", file=sys.stderr)
+        return
+
+    package_name = first["project"]
+    print(f"Combinando {len(shards)} shards...", file=sys.stderr if output_mode == 'stdout' else sys.stdout)
+
+    # Reconstrói o mapa global na mesma ordem do scan de uma análise única
+    all_facts = sorted((facts for shard in shards for facts in shard["files"]), key=lambda x: x["order"])
+    if len(all_facts) != first["total_files"]:
+        print(f"Erro: Shards contêm {len(all_facts)} arquivos, esperado {first['total_files']}.", file=sys.stderr)
+        return
+
+    all_files = {}
+    for facts in all_facts:
+        dart_file = DartFile.from_facts(facts, package_name, root_path)
+        all_files[dart_file.path] = dart_file
+
+    circular_deps = link_dependency_graph(all_files)
+    save_check_index(root_path, package_name, all_files, circular_deps)
+    files_to_report, is_partial_analysis = filter_files_to_report(all_files, target_files, output_mode)
+
+    return files_to_report, root_path, package_name, first["ignored_count"], is_partial_analysis, circular_deps, tuple(first["ignore_patterns"])
+
+def save_check_index(root_path, package_name, all_files, circular_deps):
+    """Grava o índice resumido que `dart-analyse check` lê sem reanalisar o projeto"""
+    import time
+
+    worst_functions = []
+    for f in all_files.values():
+        if f.functions:
+            worst = max(f.functions, key=lambda fn: fn["complexity"])
+            worst_functions.append([str(f.rel_path).replace('\\', '/'), worst["name"], worst["line"], worst["complexity"]])
+
+    index = {
+        "version": CHECK_INDEX_VERSION,
+        "project": package_name,
+        "generated_at": time.time(),
+        "files": len(all_files),
+        "max_function_complexity": worst_functions,
+        "god_classes": sorted(str(f.rel_path).replace('\\', '/') for f in all_files.values() if f.is_god_class),
+        "cycles": [dep["cycle"] for dep in circular_deps],
+    }
+
+    index_path = root_path / CHECK_INDEX_FILE
+    try:
+        index_path.parent.mkdir(exist_ok=True)
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'))
+    except OSError as e:
+        print(f"Aviso: Não foi possível gravar o índice do check: {e}", file=sys.stderr)
+
+def _load_check_index(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    if index.get("version") != CHECK_INDEX_VERSION:
+        raise ValueError("versão de índice incompatível")
+    return index
+
+def _count_stale_files(root_path, generated_at):
+    """Quantos .dart (não ignorados) foram modificados depois da geração do índice"""
+    ignore_patterns = load_ignore_patterns(root_path)
+    stale = 0
+    for root, dirs, files in os.walk(root_path / 'lib'):
+        for file in files:
+            if file.endswith('.dart') and not should_ignore_file(file, ignore_patterns):
+                if os.stat(os.path.join(root, file)).st_mtime > generated_at:
+                    stale += 1
+    return stale
+
+def run_check(argv):
+    """Entrada leve para hooks de editor/pre-commit: avalia limites a partir do índice em cache
+
+    Não parseia nenhum arquivo .dart; o índice é atualizado por qualquer análise
+    completa (`dart-analyse`, `dart-analyse merge`).
+
+    Returns:
+        Código de saída: 0 se todos os limites passam, 1 se algum falha, 2 sem índice
+        ou se o baseline não pôde ser gravado
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='dart-analyse check',
+        description='Verifica limites (complexidade, ciclos novos, god classes novas) usando o índice da última análise'
+    )
+    parser.add_argument('--max-complexity',
+                        type=int,
+                        default=CHECK_MAX_FUNCTION_COMPLEXITY,
+                        metavar='N',
+                        help=f'Complexidade ciclomática máxima por função. Padrão: {CHECK_MAX_FUNCTION_COMPLEXITY}')
+    parser.add_argument('--baseline',
+                        metavar='FILE',
+                        default=None,
+                        help=f'Índice de referência para ciclos/god classes "novos". Padrão: {CHECK_BASELINE_FILE.as_posix()}')
+    parser.add_argument('--save-baseline',
+                        action='store_true',
+                        help='Salva o índice atual como referência e sai')
+    args = parser.parse_args(argv)
+
+    root_path = Path(os.getcwd())
+    try:
+        index = _load_check_index(root_path / CHECK_INDEX_FILE)
+    except (OSError, ValueError) as e:
+        print(f"Erro: Índice não disponível ({e}). Execute `dart-analyse` antes do check.", file=sys.stderr)
+        return 2
+
+    baseline_path = Path(args.baseline) if args.baseline else root_path / CHECK_BASELINE_FILE
+    if args.save_baseline:
+        try:
+            with open(baseline_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f, separators=(',', ':'))
+        except OSError as e:
+            print(f"Erro: Não foi possível salvar o baseline: {e}", file=sys.stderr)
+            return 2
+        print(f"Baseline salvo: {baseline_path}")
+        return 0
+
+    try:
+        baseline = _load_check_index(baseline_path)
+    except (OSError, ValueError):
+        baseline = {"cycles": [], "god_classes": []}
+
+    stale = _count_stale_files(root_path, index["generated_at"])
+    if stale:
+        print(f"Aviso: {stale} arquivo(s) modificado(s) depois da última análise; o índice pode estar desatualizado.", file=sys.stderr)
+
+    failed = False
+
+    too_complex = sorted((entry for entry in index["max_function_complexity"] if entry[3] > args.max_complexity), key=lambda x: -x[3])
+    worst = max((entry[3] for entry in index["max_function_complexity"]), default=0)
+    print(f"{'✗' if too_complex else '✓'} Complexidade máxima por função: {worst} (limite {args.max_complexity})")
+    for path, name, line, complexity in too_complex[:5]:
+        print(f"    {path}:{line} {name} ({complexity})")
+    failed |= bool(too_complex)
+
+    # Um mesmo ciclo pode aparecer com pontos de partida diferentes: compara pelo conjunto de nós
+    known_cycles = {frozenset(cycle) for cycle in baseline["cycles"]}
+    new_cycles = {}
+    for cycle in index["cycles"]:
+        if frozenset(cycle) not in known_cycles:
+            new_cycles.setdefault(frozenset(cycle), cycle)
+    new_cycles = list(new_cycles.values())
+    print(f"{'✗' if new_cycles else '✓'} Ciclos novos: {len(new_cycles)}")
+    for cycle in new_cycles[:5]:
+        print(f"    {' -> '.join(cycle)}")
+    failed |= bool(new_cycles)
+
+    known_god_classes = set(baseline["god_classes"])
+    new_god_classes = [path for path in index["god_classes"] if path not in known_god_classes]
+    print(f"{'✗' if new_god_classes else '✓'} God classes novas: {len(new_god_classes)}")
+    for path in new_god_classes[:5]:
+        print(f"    {path}")
+    failed |= bool(new_god_classes)
+
+    print("RESULTADO: FALHOU" if failed else "RESULTADO: OK")
+    return 1 if failed else 0
+
+def main(argv=None):
+    """Ponto de entrada da CLI; devolve o código de saída"""
+    if argv is None:
+        argv = sys.argv[1:]
+
+    # Caminho rápido: `check` só lê o índice, sem montar o parser completo
+    if argv and argv[0] == 'check':
+        return run_check(argv[1:])
+
+    import argparse
+
     parser = argparse.ArgumentParser(
         description='Analisador de Arquitetura Flutter - Extrai métricas de código e dependências',
         epilog='''
@@ -800,16 +2023,40 @@ Exemplos de uso:
     # Estatísticas por hotspot
     dart-analyse --output stdout | jq '.hotspots_top_10[] | select(.risk_score > 1000)'
 
-Nota: Quando --output stdout é usado, o jq é automaticamente aplicado para colorização
-      em terminal interativo. Para pipes, o JSON puro é enviado.
+  Relatórios grandes (sem indentação e/ou comprimido):
+    dart-analyse --output file --compact --gzip
+
+  Grafo de dependências (Graphviz/GraphML), colapsado por feature:
+    dart-analyse --format dot --graph-depth 3 --graph-highlight --output file
+    dart-analyse --format graphml --graph-packages --output file
+
+  Hook rápido (editor/pre-commit), usando o índice da última análise:
+    dart-analyse check --max-complexity 15
+    dart-analyse check --save-baseline
+
+  Análise distribuída (shards por hash do caminho, combinados depois):
+    dart-analyse shard --shard-index 0 --shard-count 4
+    dart-analyse shard --shard-index 1 --shard-count 4
+    ...
+    dart-analyse merge --shards RELATORIO_ARQUITETURA.shard-*-of-4.json.gz
+
+Nota: Quando --output stdout é usado em terminal interativo, o JSON é colorizado
+      nativamente (mesmo esquema do jq). Para pipes, o JSON puro é enviado.
+      Use --no-color (ou NO_COLOR=1) para desativar as cores.
         ''',
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     
+    parser.add_argument('command',
+                        nargs='?',
+                        choices=['analyze', 'shard', 'merge', 'check'],
+                        default='analyze',
+                        help='analyze (padrão): análise completa | shard: grava fatos de um subconjunto de arquivos | merge: combina shards e gera o relatório | check: limites a partir do índice em cache (ver `check --help`)')
+    
     parser.add_argument('--format', 
-                        choices=['md', 'json'], 
+                        choices=['md', 'json', 'dot', 'graphml'], 
                         default='json', 
-                        help='Formato de saída: md (Markdown) ou json (JSON para IA/automação)')
+                        help='Formato de saída: md (Markdown), json (JSON para IA/automação) ou dot/graphml (grafo de dependências)')
     
     parser.add_argument('--files', 
                         nargs='+', 
@@ -826,14 +2073,104 @@ Nota: Quando --output stdout é usado, o jq é automaticamente aplicado para col
                         default=None,
                         help='Nome do arquivo de saída (sem extensão). Padrão: RELATORIO_ARQUITETURA')
     
-    args = parser.parse_args()
+    parser.add_argument('--compact',
+                        action='store_true',
+                        help='Gera JSON sem indentação (menor e mais rápido de escrever)')
     
-    files_to_report, root_path, package_name, ignored_count, is_partial, circular_deps, ignore_patterns = analyze_project(
-        os.getcwd(), args.format, args.files, args.output
-    )
+    parser.add_argument('--no-color',
+                        action='store_true',
+                        help='Desativa as cores ANSI no JSON em terminal (também via variável NO_COLOR)')
+    
+    parser.add_argument('--gzip',
+                        action='store_true',
+                        help='Comprime o relatório JSON em arquivo (.json.gz). Válido com --output file')
+    
+    parser.add_argument('--shard-index',
+                        type=int,
+                        default=0,
+                        help='shard: índice deste shard (0 a N-1)')
+    
+    parser.add_argument('--shard-count',
+                        type=int,
+                        default=1,
+                        help='shard: número total de shards')
+    
+    parser.add_argument('--shards',
+                        nargs='+',
+                        metavar='SHARD_FILE',
+                        help='merge: arquivos de shard (.json.gz) a combinar')
+    
+    parser.add_argument('--parse-timeout',
+                        type=float,
+                        default=PARSE_TIMEOUT_SECONDS,
+                        metavar='SECONDS',
+                        help=f'Tempo máximo de análise por arquivo; 0 desativa. Padrão: {PARSE_TIMEOUT_SECONDS}')
+    
+    parser.add_argument('--split',
+                        action='store_true',
+                        help='md: divide o relatório em index.md + uma página por diretório (pasta NAME/; páginas antigas geradas pela ferramenta são removidas). Requer --output file')
+    
+    parser.add_argument('--top-functions',
+                        type=int,
+                        default=TOP_FUNCTIONS_COUNT,
+                        metavar='N',
+                        help=f'Quantidade de funções mais complexas no relatório. Padrão: {TOP_FUNCTIONS_COUNT}')
+    
+    parser.add_argument('--module-depth',
+                        type=int,
+                        default=DEFAULT_MODULE_DEPTH,
+                        metavar='N',
+                        help=f'Componentes do caminho que definem um módulo no acoplamento entre pastas. Padrão: {DEFAULT_MODULE_DEPTH} (lib/features/<feature>)')
+    
+    parser.add_argument('--graph-depth',
+                        type=int,
+                        default=0,
+                        metavar='N',
+                        help='dot/graphml: colapsa nós por diretório com N componentes (0 = um nó por arquivo)')
+    
+    parser.add_argument('--graph-packages',
+                        action='store_true',
+                        help='dot/graphml: inclui pacotes externos (package:x) como nós')
+    
+    parser.add_argument('--graph-highlight',
+                        action='store_true',
+                        help='dot/graphml: destaca ciclos (SCCs) e hotspots')
+    
+    parser.add_argument('--no-cache',
+                        action='store_true',
+                        help=f'Não lê nem grava o cache de métricas por função ({FUNCTION_CACHE_FILE.as_posix()}); o índice do check continua sendo atualizado')
+    
+    args, check_argv = parser.parse_known_args(argv)
+    
+    # `check` depois de outras opções (ex: `--format json check`): as opções
+    # próprias do check ficam em check_argv e as demais são irrelevantes
+    if args.command == 'check':
+        return run_check(check_argv)
+    if check_argv:
+        parser.error(f"argumentos não reconhecidos: {' '.join(check_argv)}")
+    
+    if args.command == 'shard':
+        if analyze_shard(os.getcwd(), args.shard_index, args.shard_count, args.output_file, args.parse_timeout, not args.no_cache) is None:
+            return 1
+        return 0
+    
+    if args.command == 'merge':
+        result = merge_shards(os.getcwd(), args.shards or [], args.files, args.output)
+    else:
+        result = analyze_project(os.getcwd(), args.format, args.files, args.output, args.parse_timeout, not args.no_cache)
+    
+    if result is None:
+        return 1
+    files_to_report, root_path, package_name, ignored_count, is_partial, circular_deps, ignore_patterns = result
     
     # Gera o relatório no formato e destino especificados
-    if args.format == 'json':
-        generate_json_report(files_to_report, root_path, package_name, ignored_count, is_partial, circular_deps, ignore_patterns, args.output, args.output_file)
+    if args.format in ('dot', 'graphml'):
+        generate_graph_report(files_to_report, root_path, package_name, args.format, args.output, args.output_file, args.graph_depth, args.graph_packages, args.graph_highlight)
+    elif args.format == 'json':
+        generate_json_report(files_to_report, root_path, package_name, ignored_count, is_partial, circular_deps, ignore_patterns, args.output, args.output_file, args.compact, args.gzip, args.top_functions, args.module_depth, not args.no_color)
     else:
-        generate_markdown_report(files_to_report, root_path, package_name, ignored_count, is_partial, ignore_patterns, args.output, args.output_file)
\ No newline at end of file
+        generate_markdown_report(files_to_report, root_path, package_name, ignored_count, is_partial, ignore_patterns, args.output, args.output_file, args.top_functions, args.module_depth, args.split)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -52,22 +52,28 @@ DEST_SCRIPT="$INSTALL_DIR/dart-analyse.py"
 cp "$ANALYSE_SCRIPT" "$DEST_SCRIPT"
 echo "✓ dart-analyse.py copiado"
 
+# Pré-compila o bytecode usado pelo wrapper
+python3 -m py_compile "$DEST_SCRIPT" && echo "✓ bytecode pré-compilado"
+
 # Cria wrapper executável
 WRAPPER_SCRIPT="$INSTALL_DIR/dart-analyse"
 cat > "$WRAPPER_SCRIPT" << 'EOF'
 #!/usr/bin/env python3
 import sys
 import os
+import importlib.util
 
 # Obtém o caminho do script
 script_dir = os.path.dirname(os.path.abspath(__file__))
 analyse_script = os.path.join(script_dir, 'dart-analyse.py')
 
-# Executa o script
+# Carrega como módulo (em vez de exec) para reaproveitar o bytecode em
+# __pycache__: a inicialização fica bem mais rápida em hooks (dart-analyse check)
 if os.path.exists(analyse_script):
-    with open(analyse_script, 'r') as f:
-        code = f.read()
-    exec(code)
+    spec = importlib.util.spec_from_file_location('dart_analyse', analyse_script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    sys.exit(module.main())
 else:
     print(f"Erro: {analyse_script} não encontrado", file=sys.stderr)
     sys.exit(1)
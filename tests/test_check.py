@@ -0,0 +1,55 @@
+"""Comando `dart-analyse check` a partir do índice gravado pela análise completa"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import analyse  # noqa: E402
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / "pubspec.yaml").write_text("name: app\n", encoding="utf-8")
+    lib = tmp_path / "lib"
+    lib.mkdir()
+    (lib / "main.dart").write_text(
+        "void main() {\n"
+        "  if (a && b) {\n"
+        "    for (final x in xs) {\n"
+        "      if (x) {}\n"
+        "    }\n"
+        "  }\n"
+        "}\n",
+        encoding="utf-8",
+    )
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.parametrize("prefix", [[], ["--format", "json"], ["--output", "stdout", "--format", "md"]])
+def test_check_dispatch_after_other_options(project, prefix):
+    assert analyse.main(["--output", "file"]) == 0
+
+    assert analyse.main(prefix + ["check", "--max-complexity", "2"]) == 1
+    assert analyse.main(prefix + ["check", "--max-complexity", "10"]) == 0
+
+
+def test_check_without_index(project):
+    assert analyse.main(["check"]) == 2
+
+
+def test_index_refreshed_with_no_cache(project):
+    assert analyse.main(["--output", "file", "--no-cache"]) == 0
+
+    assert (project / analyse.CHECK_INDEX_FILE).exists()
+    assert not (project / analyse.FUNCTION_CACHE_FILE).exists()
+    assert analyse.main(["check", "--max-complexity", "2"]) == 1
+
+
+def test_save_baseline_to_missing_directory(project, capsys):
+    assert analyse.main(["--output", "file"]) == 0
+
+    assert analyse.main(["check", "--save-baseline", "--baseline", "missing/dir/baseline.json"]) == 2
+    assert "Erro: Não foi possível salvar o baseline" in capsys.readouterr().err
@@ -0,0 +1,55 @@
+"""Métricas por função calculadas por scan_function_metrics"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import analyse  # noqa: E402
+
+
+def single_function(source):
+    (function,) = analyse.scan_function_metrics(source)
+    return function
+
+
+@pytest.mark.parametrize("header", [
+    "for (var i = 0; i < n; i++)",
+    "for (;;)",
+    "for (final x in xs)",
+])
+def test_for_headers_are_control_blocks(header):
+    function = single_function(f"void f() {{\n  {header} {{\n    if (a) {{}}\n  }}\n}}\n")
+
+    assert function["complexity"] == 3
+    assert function["cognitive_complexity"] == 3
+    assert function["max_nesting"] == 2
+
+
+def test_nullable_types_are_not_decisions():
+    function = single_function(
+        "void f(String? name, {int? count}) {\n"
+        "  String? a;\n"
+        "  int? b = null;\n"
+        "  Map<String, int?>? c;\n"
+        "  List<Foo?> d = [];\n"
+        "  void Function()? e;\n"
+        "}\n"
+    )
+
+    assert function["complexity"] == 1
+
+
+def test_conditional_operators_are_decisions():
+    function = single_function(
+        "int f(int? a, Foo? foo) {\n"
+        "  final b = a == null ? 0 : a;\n"
+        "  final c = a!=null?a:0;\n"
+        "  final d = a ?? 0;\n"
+        "  final e = foo?.bar ?? foo?[0];\n"
+        "  return b;\n"
+        "}\n"
+    )
+
+    assert function["complexity"] == 5
@@ -0,0 +1,58 @@
+"""Saída JSON no terminal: cores ANSI apenas quando o destino suporta"""
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import analyse  # noqa: E402
+
+
+class FakeTerminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / "pubspec.yaml").write_text("name: app\n", encoding="utf-8")
+    (tmp_path / "lib").mkdir()
+    (tmp_path / "lib" / "main.dart").write_text("void main() {}\n", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("NO_COLOR", raising=False)
+    return tmp_path
+
+
+def run_json(monkeypatch, *options, stdout_class=FakeTerminal):
+    stdout = stdout_class()
+    # Substituído durante a chamada: a captura do pytest troca sys.stdout entre fases
+    with monkeypatch.context() as patch:
+        patch.setattr(sys, "stdout", stdout)
+        assert analyse.main(["--format", "json", "--output", "stdout", "--no-cache", *options]) == 0
+    return stdout.getvalue()
+
+
+def test_terminal_output_is_colorized(project, monkeypatch):
+    assert "\033[" in run_json(monkeypatch)
+
+
+def test_no_color_flag(project, monkeypatch):
+    json.loads(run_json(monkeypatch, "--no-color"))
+
+
+def test_no_color_environment_variable(project, monkeypatch):
+    monkeypatch.setenv("NO_COLOR", "1")
+    json.loads(run_json(monkeypatch))
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="simula um console Windows sem ctypes.windll")
+def test_windows_console_without_vt_support(project, monkeypatch):
+    monkeypatch.setattr(sys, "platform", "win32")
+    json.loads(run_json(monkeypatch))
+
+
+def test_piped_output_is_plain_json(project, monkeypatch):
+    json.loads(run_json(monkeypatch, stdout_class=io.StringIO))
@@ -0,0 +1,55 @@
+"""Relatório Markdown dividido por diretório (--split)"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import analyse  # noqa: E402
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "pubspec.yaml").write_text("name: app\n", encoding="utf-8")
+    for rel_path in ("main.dart", "a__b/x.dart", "a/b/y.dart", "old/z.dart"):
+        path = tmp_path / "lib" / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("class X {}\n", encoding="utf-8")
+    return tmp_path
+
+
+def split_report(project, name="docs"):
+    result = analyse.analyze_project(str(project), 'md', output_mode='file', use_cache=False)
+    files_to_report, root_path, package_name, ignored_count, is_partial, _, ignore_patterns = result
+    analyse.generate_markdown_report(
+        files_to_report, root_path, package_name, ignored_count, is_partial, ignore_patterns,
+        output_mode='file', output_file=name, split=True,
+    )
+    return project / name
+
+
+def test_colliding_directories_get_distinct_pages(project):
+    output_dir = split_report(project)
+
+    pages = analyse._markdown_page_names(["lib/a__b", "lib/a/b", "lib", "index"])
+    assert len(set(pages.values())) == 4
+    assert "index.md" not in pages.values()
+    for page_name in pages.values():
+        if page_name != pages["index"]:
+            assert (output_dir / page_name).exists()
+
+
+def test_only_stale_generated_pages_are_removed(project):
+    output_dir = split_report(project)
+    old_page = output_dir / analyse._markdown_page_names(["lib/old"])["lib/old"]
+    assert old_page.exists()
+
+    guide = output_dir / "guide.md"
+    guide.write_text("# Guia escrito à mão\n", encoding="utf-8")
+    (project / "lib" / "old" / "z.dart").unlink()
+    split_report(project)
+
+    assert not old_page.exists()
+    assert guide.read_text(encoding="utf-8") == "# Guia escrito à mão\n"
+    assert "lib/old" not in (output_dir / "index.md").read_text(encoding="utf-8")
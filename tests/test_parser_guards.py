@@ -0,0 +1,181 @@
+"""Entradas Dart adversariais: o parser deve terminar dentro do orçamento de tempo
+por arquivo e, quando as proteções disparam, registrar o motivo em parse_warning
+"""
+import random
+import signal
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import analyse  # noqa: E402
+
+# Tempo máximo de análise por arquivo, com o timeout do parser desligado
+PARSE_BUDGET_SECONDS = 2.0
+
+FUZZ_TOKENS = [
+    "{", "}", "(", ")", "[", "]", "<", ">", ";", ",", "?", "??", "?.", "&&", "||", ":",
+    "'", '"', "'''", "r'", "//", "/*", "*/", "\\", "\n", " ", "=>", "@override",
+    "if", "else", "for", "while", "switch", "case", "catch", "class", "void", "Future",
+    "async", "get", "_private", "name", "Widget", "String?", "int", "$x", "${",
+]
+
+
+def write_dart(tmp_path, content, name="adversarial.dart"):
+    path = tmp_path / "lib" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return analyse.DartFile(path, "app", tmp_path)
+
+
+def parse_within_budget(dart_file):
+    """Analisa sem o timeout do parser e devolve o tempo gasto"""
+    start = time.perf_counter()
+    dart_file.parse(timeout=0)
+    elapsed = time.perf_counter() - start
+    assert elapsed < PARSE_BUDGET_SECONDS, f"{dart_file.rel_path}: {elapsed:.2f}s"
+    return elapsed
+
+
+def huge_lines():
+    # Linhas logo abaixo do limite, cheias de parênteses abertos, `?` e membros privados
+    line = ("void _f(" + "_a ? (" * 400)[:analyse.MAX_LINE_LENGTH - 1]
+    return "\n".join([line] * 200)
+
+
+def deep_nesting():
+    depth = 5000
+    return "void main() {\n" + "if (a) {\n" * depth + "}\n" * depth + "}\n"
+
+
+def long_parameter_list():
+    params = ",\n".join(f"  int param{i}" for i in range(20000))
+    return f"void build(\n{params}\n) {{\n  return;\n}}\n"
+
+
+def unbalanced_parameter_lists():
+    # Sem `)`: um regex de parâmetros sem limite ficaria quadrático aqui
+    return "void a(\n" * 40000
+
+
+def massive_string_literal():
+    body = "if (x) { for (;;) { '\" } } ? : && _hidden\n" * 20000
+    return f"const text = '''\n{body}''';\nvoid main() {{}}\n"
+
+
+def unterminated_string_literal():
+    return "void main() {\n  var s = '''" + "{ ( ' \" \n" * 50000
+
+
+ADVERSARIAL_INPUTS = {
+    "huge_lines": huge_lines,
+    "deep_nesting": deep_nesting,
+    "long_parameter_list": long_parameter_list,
+    "unbalanced_parameter_lists": unbalanced_parameter_lists,
+    "massive_string_literal": massive_string_literal,
+    "unterminated_string_literal": unterminated_string_literal,
+}
+
+
+@pytest.mark.parametrize("name", sorted(ADVERSARIAL_INPUTS))
+def test_adversarial_input_parses_within_budget(tmp_path, name):
+    content = ADVERSARIAL_INPUTS[name]()
+    assert len(content) <= analyse.MAX_FILE_BYTES
+
+    dart_file = write_dart(tmp_path, content)
+    parse_within_budget(dart_file)
+
+    assert dart_file.parse_warning is None
+    assert dart_file.content_hash is not None
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_fuzzed_input_parses_within_budget(tmp_path, seed):
+    rng = random.Random(seed)
+    content = "".join(rng.choice(FUZZ_TOKENS) + rng.choice(("", " ")) for _ in range(50000))
+
+    dart_file = write_dart(tmp_path, content)
+    parse_within_budget(dart_file)
+
+
+def test_parameter_regex_is_bounded():
+    assert "{0,%d}" % analyse.MAX_PARAMS_LENGTH in analyse.FUNCTION_DECLARATION_RE.pattern
+
+
+def test_deep_nesting_metrics(tmp_path):
+    dart_file = write_dart(tmp_path, deep_nesting())
+    dart_file.parse(timeout=0)
+
+    (function,) = dart_file.functions
+    assert function["name"] == "main"
+    assert function["max_nesting"] == 5000
+
+
+def test_file_over_size_limit_is_skipped(tmp_path):
+    line = "int value = 1; // " + "x" * 80 + "\n"
+    content = "import 'other.dart';\nclass Big {}\n" + line * (analyse.MAX_FILE_BYTES // len(line) + 1)
+
+    dart_file = write_dart(tmp_path, content)
+    parse_within_budget(dart_file)
+
+    assert "muito grande" in dart_file.parse_warning
+    assert dart_file.raw_imports == ["other.dart"]
+    assert dart_file.lines_of_code > 0
+    assert dart_file.num_classes == 0
+    assert dart_file.cyclomatic_complexity == 0
+    assert dart_file.functions == []
+
+
+def test_line_over_length_limit_is_skipped(tmp_path):
+    content = "import 'other.dart';\nvoid main() { if (a) {} }\nconst x = '" + "a" * analyse.MAX_LINE_LENGTH + "';\n"
+
+    dart_file = write_dart(tmp_path, content)
+    parse_within_budget(dart_file)
+
+    assert "Linha muito longa" in dart_file.parse_warning
+    assert dart_file.raw_imports == ["other.dart"]
+    assert dart_file.lines_of_code == 3
+    assert dart_file.cyclomatic_complexity == 0
+    assert dart_file.functions == []
+
+
+requires_sigalrm = pytest.mark.skipif(not hasattr(signal, "SIGALRM"), reason="timeout depende de SIGALRM")
+
+
+@requires_sigalrm
+def test_parse_timeout_is_recorded(tmp_path, monkeypatch):
+    def stalled_scan(content):
+        while True:
+            pass
+
+    monkeypatch.setattr(analyse, "scan_function_metrics", stalled_scan)
+    dart_file = write_dart(tmp_path, "import 'other.dart';\nclass A {}\nvoid main() { if (a) {} }\n")
+
+    start = time.perf_counter()
+    dart_file.parse(timeout=0.2)
+    assert time.perf_counter() - start < PARSE_BUDGET_SECONDS
+
+    assert "excedeu 0.2s" in dart_file.parse_warning
+    assert dart_file.raw_imports == ["other.dart"]
+    assert dart_file.lines_of_code == 3
+    assert dart_file.num_classes == 0
+    assert dart_file.cyclomatic_complexity == 0
+
+
+@requires_sigalrm
+def test_parse_time_guard_interrupts_and_restores_handler():
+    previous = signal.getsignal(signal.SIGALRM)
+    with pytest.raises(analyse.ParseTimeout):
+        with analyse.parse_time_guard(0.05):
+            while True:
+                pass
+    assert signal.getsignal(signal.SIGALRM) is previous
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+
+
+def test_parse_time_guard_disabled_with_zero():
+    with analyse.parse_time_guard(0):
+        time.sleep(0.01)
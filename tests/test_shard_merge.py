@@ -0,0 +1,64 @@
+"""`shard` + `merge` deve produzir o mesmo relatório de uma análise única"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import analyse  # noqa: E402
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "pubspec.yaml").write_text("name: app\n", encoding="utf-8")
+    sources = {
+        "main.dart": "import 'package:app/core/utils.dart';\nimport 'features/home/home.dart';\n"
+                     "void main() {\n  if (a && b) { run(); }\n}\n",
+        "core/utils.dart": "import '../features/home/home.dart';\nvoid run() {\n  for (final x in xs) { x ? a : b; }\n}\n",
+        "features/home/home.dart": "import 'package:app/core/utils.dart';\nclass Home {\n  void _load() { while (a) {} }\n}\n",
+        "features/home/unused.dart": "class Unused {}\n",
+        # Pulado pelo parser (linha longa) mas com mais de 500 LOC: não é god class
+        "generated/big.dart": "const data = '" + "x" * analyse.MAX_LINE_LENGTH + "';\n"
+                              + "int value = 1;\n" * 600,
+    }
+    for rel_path, content in sources.items():
+        path = tmp_path / "lib" / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    return tmp_path
+
+
+def json_report(project, result, name):
+    analyse.generate_json_report(*result, output_mode='file', output_file=name)
+    report = json.loads((project / f"{name}.json").read_text(encoding="utf-8"))
+    del report["meta"]["analysis_date"]
+    return report
+
+
+def check_index(project):
+    index = json.loads((project / analyse.CHECK_INDEX_FILE).read_text(encoding="utf-8"))
+    del index["generated_at"]
+    return index
+
+
+def analyze_single(project):
+    return analyse.analyze_project(str(project), 'json', output_mode='file', use_cache=False)
+
+
+@pytest.mark.parametrize("shard_count", [1, 3])
+def test_merged_shards_match_single_run(project, shard_count):
+    single = json_report(project, analyze_single(project), "single")
+    single_index = check_index(project)
+
+    shard_paths = [
+        analyse.analyze_shard(str(project), i, shard_count, use_cache=False)
+        for i in range(shard_count)
+    ]
+    merged = json_report(project, analyse.merge_shards(str(project), shard_paths), "merged")
+
+    assert merged == single
+    assert check_index(project) == single_index
+    assert single["code_health"]["god_classes_count"] == 0
+    assert any(w["path"] == "lib/generated/big.dart" for w in single["meta"]["parse_warnings"])
@@ -26,6 +26,9 @@ for file in "${FILES[@]}"; do
     fi
 done
 
+# Bytecode gerado pelo wrapper
+rm -f "$INSTALL_DIR"/__pycache__/dart-analyse.*.pyc
+
 echo ""
 
 if [ $REMOVED -eq 0 ]; then